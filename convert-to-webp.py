@@ -3,31 +3,133 @@
 Convert JPG images to WebP format for better web performance
 """
 
+import hashlib
+import json
+import mmap
 import os
+import shutil
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 
-def convert_jpg_to_webp(jpg_path, webp_path, quality=85):
-    """Convert a single JPG image to WebP format"""
+# Optional: pip install xxhash for faster content hashing (falls back to blake2b)
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# libwebp's own encoder is faster than Pillow's wrapper and can use
+# several threads per image (-mt). Fall back to Pillow when not installed.
+CWEBP = shutil.which('cwebp')
+
+# Sidecar file (per image directory) mapping JPG filename -> content hash
+# of the JPG at its last successful conversion
+CACHE_FILE = '.webp-cache.json'
+
+def _digest_bytes(data):
+    if xxhash is not None:
+        return 'xxh3:' + xxhash.xxh3_64(data).hexdigest()
+    return 'blake2b:' + hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def file_digest(path, size=None):
+    """
+    Content hash of a file, prefixed with the algorithm used
+
+    Pass size (in bytes) if the caller has already stat'd the file.
+    """
+    with open(path, 'rb') as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        # mmap can't map an empty file
+        if size == 0:
+            return _digest_bytes(b'')
+        # Hash the mapped pages directly rather than copying the whole
+        # image into a bytes object first
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _digest_bytes(mm)
+
+def convert_jpg_to_webp(jpg_path, webp_path, quality=85, jpg_stat=None, multithread=True):
+    """
+    Convert a single JPG image to WebP format, returning (success, log lines)
+
+    Pass jpg_stat (an os.stat result) if the caller already has one, to
+    save a syscall. multithread lets cwebp use several threads for this
+    one image; turn it off when images are already converted in parallel.
+    """
+    cwebp_error = None
     try:
-        with Image.open(jpg_path) as img:
-            # Convert to RGB if necessary (for transparency handling)
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
+        if CWEBP:
+            # cwebp reads the JPG directly, so no decode on our side
+            cmd = [CWEBP, '-q', str(quality), jpg_path, '-o', webp_path]
+            if multithread:
+                cmd.insert(1, '-mt')
+            try:
+                subprocess.run(cmd, check=True, capture_output=True)
+            except subprocess.CalledProcessError as e:
+                # e.g. CMYK/YCCK JPGs, which cwebp's JPEG reader rejects
+                # but Pillow converts fine: retry with Pillow below
+                cwebp_error = e.stderr.decode(errors='replace').strip() or str(e)
+
+        if not CWEBP or cwebp_error is not None:
+            # JPGs are never RGBA or palette images, so no RGB conversion
+            # is needed before encoding
+            with Image.open(jpg_path) as img:
+                # Save as WebP with specified quality
+                img.save(webp_path, 'WebP', quality=quality, optimize=True)
+
+        # Get file sizes for comparison
+        jpg_size = (jpg_stat or os.stat(jpg_path)).st_size
+        webp_size = os.stat(webp_path).st_size
+        savings = ((jpg_size - webp_size) / jpg_size) * 100
+
+        return True, [
+            f"✅ {os.path.basename(jpg_path)} → {os.path.basename(webp_path)}",
+            f"   Size: {jpg_size//1024}KB → {webp_size//1024}KB ({savings:.1f}% smaller)",
+        ]
 
-            # Save as WebP with specified quality
-            img.save(webp_path, 'WebP', quality=quality, optimize=True)
+    except Exception as e:
+        lines = [f"❌ Error converting {jpg_path}: {e}"]
+        if cwebp_error is not None:
+            lines.append(f"   cwebp: {cwebp_error}")
+        return False, lines
+
+def _convert_one(job):
+    """
+    Worker for the process pool: takes (jpg_path, cached digest,
+    multithread) and returns (converted successfully, log lines, digest to
+    cache or None)
+    """
+    jpg_path, cached_digest, multithread = job
+    jpg_file = os.path.basename(jpg_path)
+    webp_path = jpg_path.rsplit('.', 1)[0] + '.webp'
+
+    # One stat per file, reused for hashing, the mtime check and the size report
+    try:
+        jpg_stat = os.stat(jpg_path)
+        digest = file_digest(jpg_path, jpg_stat.st_size)
+    except OSError as e:
+        # Unreadable JPG: report it and carry on with the rest of the batch
+        return False, [f"❌ Error converting {jpg_path}: {e}"], None
+    try:
+        webp_stat = os.stat(webp_path)
+    except FileNotFoundError:
+        webp_stat = None
 
-            # Get file sizes for comparison
-            jpg_size = os.path.getsize(jpg_path)
-            webp_size = os.path.getsize(webp_path)
-            savings = ((jpg_size - webp_size) / jpg_size) * 100
+    if webp_stat is not None:
+        # Skip if the JPG content hasn't changed since the last conversion,
+        # even if its mtime has (touched, copied, re-synced...)
+        if digest == cached_digest:
+            return False, [f"⏭️  Skipping {jpg_file} (unchanged since last conversion)"], digest
 
-            print(f"✅ {os.path.basename(jpg_path)} → {os.path.basename(webp_path)}")
-            print(f"   Size: {jpg_size//1024}KB → {webp_size//1024}KB ({savings:.1f}% smaller)")
+        # Not in the cache yet: fall back to comparing mtimes
+        if cached_digest is None and webp_stat.st_mtime > jpg_stat.st_mtime:
+            return False, [f"⏭️  Skipping {jpg_file} (WebP already exists and is newer)"], digest
 
-    except Exception as e:
-        print(f"❌ Error converting {jpg_path}: {e}")
+    success, lines = convert_jpg_to_webp(
+        jpg_path, webp_path, jpg_stat=jpg_stat, multithread=multithread
+    )
+    return success, lines, digest if success else None
 
 def main():
     # Directory containing the brownie bar images
@@ -46,20 +148,42 @@ def main():
         print("❌ No JPG files found in directory")
         return
 
+    cache_path = os.path.join(image_dir, CACHE_FILE)
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r') as f:
+            try:
+                cache = json.load(f)
+            except ValueError:
+                # Truncated or corrupt (e.g. an interrupted write): it's only
+                # a cache, so start over and rebuild it
+                cache = {}
+
+    # WebP encoding is CPU-bound, so spread the files across all cores.
+    # With more than one worker the cores are already busy, so cwebp's own
+    # -mt threading would only oversubscribe them.
+    workers = min(os.cpu_count() or 1, len(jpg_files))
+    multithread = workers == 1
+
+    jobs = [(os.path.join(image_dir, f), cache.get(f), multithread) for f in jpg_files]
     converted_count = 0
 
-    for jpg_file in jpg_files:
-        jpg_path = os.path.join(image_dir, jpg_file)
-        webp_file = jpg_file.rsplit('.', 1)[0] + '.webp'
-        webp_path = os.path.join(image_dir, webp_file)
-
-        # Skip if WebP already exists and is newer
-        if os.path.exists(webp_path) and os.path.getmtime(webp_path) > os.path.getmtime(jpg_path):
-            print(f"⏭️  Skipping {jpg_file} (WebP already exists and is newer)")
-            continue
-
-        convert_jpg_to_webp(jpg_path, webp_path)
-        converted_count += 1
+    # Workers return their log lines so output stays in file order.
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for jpg_file, (converted, lines, digest) in zip(jpg_files, ex.map(_convert_one, jobs)):
+            for line in lines:
+                print(line)
+            if converted:
+                converted_count += 1
+            if digest:
+                cache[jpg_file] = digest
+            else:
+                cache.pop(jpg_file, None)
+
+    # Drop entries for JPGs that are no longer in the directory
+    cache = {f: cache[f] for f in jpg_files if f in cache}
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
 
     print(f"\n🎉 Conversion complete! {converted_count} images converted to WebP format.")
     print("WebP images are typically 25-35% smaller than JPG with similar quality.")
@@ -4,13 +4,95 @@ Image Optimization Script for Yourwellnessgirly Recipe Blog
 Creates responsive image variants and WebP versions for optimal performance
 
 Requirements: pip install Pillow
+(or pillow-simd for faster resizing, see docs/IMAGE-OPTIMIZATION-GUIDE.md)
 """
 
+import math
 import os
-from PIL import Image
+from PIL import Image, ImageOps, features
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
 from pathlib import Path
 
+# Output sizes (width, height) for each image type
+SIZES = {
+    'hero': {
+        '400': (400, 500),   # Mobile portrait
+        '800': (800, 1000),  # Small desktop
+        '1200': (1200, 1500), # Large desktop
+        '1600': (1600, 2000)  # High-res/retina
+    },
+    'card': {
+        '300': (300, 225),   # Small card (4:3 aspect)
+        '600': (600, 450),   # Retina card
+    },
+    'process': {
+        '400': (400, 300),   # Step images (4:3 aspect)
+        '800': (800, 600),   # Retina step images
+    },
+    'gallery': {
+        '300': (300, 300),   # Square thumbnails
+        '600': (600, 600),   # Retina thumbnails
+        '1200': (1200, 900), # Gallery lightbox (4:3)
+    }
+}
+
+def _make_variant(img, encode_pool, recipe_dir, base_name, size_name, width, height):
+    """
+    Resize, crop and save the JPG + WebP pair for one target size
+
+    Runs on a worker thread: Pillow releases the GIL while resizing and
+    encoding, so the variants of one image are produced in parallel, and
+    the WebP encode runs on encode_pool alongside this thread's JPG encode.
+    Returns the resized image (so smaller sizes can be cut from it) and
+    the log lines, which are printed by the caller to keep output ordered.
+    """
+    # Center-crop to the target aspect ratio and resize in one pass. fit()
+    # works out the crop box first, so Lanczos only filters the pixels that
+    # survive the crop.
+    resized = ImageOps.fit(img, (width, height), Image.LANCZOS, centering=(0.5, 0.5))
+
+    # Save WebP version (better compression) on a second thread, encoding
+    # from a copy of the resized image. This is one deliberate pixel copy
+    # per variant (about 9.6 MB at 1600x2000): save() stores per-call options
+    # (encoderinfo) on the image object, so two concurrent saves must not
+    # share one. A memcpy is cheap next to the encode it lets run in parallel.
+    # Pillow hands the RGB buffer straight to libwebp, which does the only
+    # RGB -> YUV 4:2:0 conversion. Don't pre-convert with img.convert('YCbCr'):
+    # that is full-range JPEG YCbCr, not WebP's limited-range YUV, and would
+    # shift the colours.
+    webp_path = f"{recipe_dir}/{base_name}-{size_name}.webp"
+    webp_done = encode_pool.submit(
+        resized.copy().save, webp_path, 'WebP', quality=80, optimize=True
+    )
+
+    # Save JPG version (optimized) from the original resized image
+    jpg_path = f"{recipe_dir}/{base_name}-{size_name}.jpg"
+    resized.save(jpg_path, 'JPEG', quality=85, optimize=True)
+
+    webp_done.result()
+
+    return resized, [
+        f"Created: {jpg_path} ({width}x{height})",
+        f"Created: {webp_path} ({width}x{height})",
+    ]
+
+def _decode_size(original_size, targets):
+    """
+    Smallest size the original can be decoded at while still covering
+    every target size once ImageOps.fit() has center-cropped it
+    """
+    original_width, original_height = original_size
+    scale = 0
+    for width, height in targets:
+        if original_width / original_height > width / height:
+            # Wider than the target: the crop keeps the full height
+            scale = max(scale, height / original_height)
+        else:
+            scale = max(scale, width / original_width)
+    return math.ceil(original_width * scale), math.ceil(original_height * scale)
+
 def create_responsive_images(input_path, recipe_name, image_type="hero"):
     """
     Create responsive image variants with proper sizing for food blog
@@ -21,80 +103,75 @@ def create_responsive_images(input_path, recipe_name, image_type="hero"):
         image_type: 'hero', 'card', 'process', or 'gallery'
     """
 
-    # Define sizes based on image type
-    sizes = {
-        'hero': {
-            '400': (400, 500),   # Mobile portrait
-            '800': (800, 1000),  # Small desktop
-            '1200': (1200, 1500), # Large desktop
-            '1600': (1600, 2000)  # High-res/retina
-        },
-        'card': {
-            '300': (300, 225),   # Small card (4:3 aspect)
-            '600': (600, 450),   # Retina card
-        },
-        'process': {
-            '400': (400, 300),   # Step images (4:3 aspect)
-            '800': (800, 600),   # Retina step images
-        },
-        'gallery': {
-            '300': (300, 300),   # Square thumbnails
-            '600': (600, 600),   # Retina thumbnails
-            '1200': (1200, 900), # Gallery lightbox (4:3)
-        }
-    }
-
     # Create output directory
     recipe_dir = f"images/recipes/{recipe_name}"
     os.makedirs(recipe_dir, exist_ok=True)
 
     # Open original image
     with Image.open(input_path) as img:
-        # Convert to RGB if necessary (for WebP compatibility)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            img = img.convert('RGB')
-
         original_width, original_height = img.size
         print(f"Original image: {original_width}x{original_height}")
 
+        # For JPEGs much bigger than the largest variant, let libjpeg decode
+        # straight to 1/2, 1/4 or 1/8 scale inside the IDCT instead of
+        # decoding every pixel and throwing most away. No-op for other formats.
+        img.draft(None, _decode_size(img.size, SIZES[image_type].values()))
+
+        # Convert to RGB if necessary (for WebP compatibility). JPEGs never
+        # carry alpha or a palette, so only other formats need the check.
+        if Path(input_path).suffix.lower() not in ('.jpg', '.jpeg'):
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGB')
+
         # Get base filename without extension
         base_name = Path(input_path).stem
 
-        # Create each size variant
-        for size_name, (width, height) in sizes[image_type].items():
-            # Calculate dimensions maintaining aspect ratio
-            img_ratio = original_width / original_height
-            target_ratio = width / height
-
-            if img_ratio > target_ratio:
-                # Image is wider, fit to height
-                new_height = height
-                new_width = int(height * img_ratio)
-            else:
-                # Image is taller, fit to width
-                new_width = width
-                new_height = int(width / img_ratio)
-
-            # Resize image
-            resized = img.resize((new_width, new_height), Image.LANCZOS)
-
-            # Crop to exact dimensions if needed (center crop)
-            if new_width != width or new_height != height:
-                left = (new_width - width) // 2
-                top = (new_height - height) // 2
-                right = left + width
-                bottom = top + height
-                resized = resized.crop((left, top, right, bottom))
-
-            # Save JPG version (optimized)
-            jpg_path = f"{recipe_dir}/{base_name}-{size_name}.jpg"
-            resized.save(jpg_path, 'JPEG', quality=85, optimize=True)
-            print(f"Created: {jpg_path} ({width}x{height})")
-
-            # Save WebP version (better compression)
-            webp_path = f"{recipe_dir}/{base_name}-{size_name}.webp"
-            resized.save(webp_path, 'WebP', quality=80, optimize=True)
-            print(f"Created: {webp_path} ({width}x{height})")
+        # Decode once up front so the worker threads share the pixel data
+        img.load()
+
+        # Create each size variant, largest first. Only the biggest size of
+        # each aspect ratio is resized from the full-resolution original;
+        # the smaller ones are downscaled from that buffer, so Lanczos reads
+        # far fewer source pixels for the small variants.
+        tasks = sorted(
+            ((size_name, width, height)
+             for size_name, (width, height) in SIZES[image_type].items()),
+            key=lambda task: task[1],
+            reverse=True
+        )
+        largest = {}
+        for task in tasks:
+            largest.setdefault(Fraction(task[1], task[2]), task)
+        first_pass = list(largest.values())
+        second_pass = [task for task in tasks if task not in first_pass]
+
+        log = {}
+        # WebP encodes get their own pool: submitting them to ex from inside
+        # its own workers could deadlock once every worker is waiting.
+        with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as ex, \
+                ThreadPoolExecutor(max_workers=min(8, len(tasks))) as encode_pool:
+            bases = {}
+            results = ex.map(
+                lambda task: _make_variant(img, encode_pool, recipe_dir, base_name, *task),
+                first_pass
+            )
+            for (size_name, width, height), (resized, lines) in zip(first_pass, results):
+                bases[Fraction(width, height)] = resized
+                log[size_name] = lines
+
+            results = ex.map(
+                lambda task: _make_variant(
+                    bases[Fraction(task[1], task[2])], encode_pool,
+                    recipe_dir, base_name, *task
+                ),
+                second_pass
+            )
+            for (size_name, _, _), (_, lines) in zip(second_pass, results):
+                log[size_name] = lines
+
+        for size_name in SIZES[image_type]:
+            for line in log[size_name]:
+                print(line)
 
 def generate_picture_element(recipe_name, base_name, image_type, alt_text, width, height, loading="lazy", fetchpriority=None):
     """Generate optimized HTML picture element"""
@@ -109,12 +186,9 @@ def generate_picture_element(recipe_name, base_name, image_type, alt_text, width
     sizes = sizes_map[image_type]
 
     # Build srcset strings
-    webp_srcset = []
-    jpg_srcset = []
-
-    for size in sizes:
-        webp_srcset.append(f"../images/recipes/{recipe_name}/{base_name}-{size}.webp {size}w")
-        jpg_srcset.append(f"../images/recipes/{recipe_name}/{base_name}-{size}.jpg {size}w")
+    prefix = f"../images/recipes/{recipe_name}/{base_name}"
+    webp_srcset = ", ".join(f"{prefix}-{size}.webp {size}w" for size in sizes)
+    jpg_srcset = ", ".join(f"{prefix}-{size}.jpg {size}w" for size in sizes)
 
     # Generate sizes attribute based on image type
     if image_type == 'hero':
@@ -129,11 +203,11 @@ def generate_picture_element(recipe_name, base_name, image_type, alt_text, width
     # Build picture element
     picture_html = f'''<picture>
     <source
-        srcset="{', '.join(webp_srcset)}"
+        srcset="{webp_srcset}"
         type="image/webp">
     <img
-        src="../images/recipes/{recipe_name}/{base_name}-{sizes[-1]}.jpg"
-        srcset="{', '.join(jpg_srcset)}"
+        src="{prefix}-{sizes[-1]}.jpg"
+        srcset="{jpg_srcset}"
         sizes="{sizes_attr}"
         width="{width}"
         height="{height}"
@@ -156,6 +230,12 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    # JPEG encoding is several times faster when Pillow is linked against
+    # libjpeg-turbo (the official wheels are; some source builds are not)
+    if not features.check_feature('libjpeg_turbo'):
+        print("⚠️  Pillow is not using libjpeg-turbo - JPEG encoding will be slow.")
+        print("   See 'Faster JPEG Encoding with libjpeg-turbo' in docs/IMAGE-OPTIMIZATION-GUIDE.md\n")
+
     create_responsive_images(args.input_path, args.recipe_name, args.type)
 
     # Example HTML output
@@ -16,6 +16,14 @@ Run this script whenever you:
 import json
 import os
 from datetime import date
+from xml.sax.saxutils import escape
+
+# Optional: pip install ijson to stream recipes.json one recipe at a time
+# instead of loading the whole file into memory
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # Paths relative to project root
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -36,52 +44,89 @@ STATIC_PAGES = [
 ]
 
 
+_TEMPLATE = (
+    "  <url>\n"
+    "    <loc>{}{}</loc>\n"
+    "    <lastmod>{}</lastmod>\n"
+    "    <changefreq>{}</changefreq>\n"
+    "    <priority>{}</priority>\n"
+    "  </url>"
+)
+
+
+# Sitemaps must entity-escape all five XML special characters
+_XML_ENTITIES = {"'": "&apos;", '"': "&quot;"}
+
+
 def build_url_entry(loc, lastmod, changefreq, priority):
-    return (
-        f"  <url>\n"
-        f"    <loc>{BASE_URL}{loc}</loc>\n"
-        f"    <lastmod>{lastmod}</lastmod>\n"
-        f"    <changefreq>{changefreq}</changefreq>\n"
-        f"    <priority>{priority}</priority>\n"
-        f"  </url>"
+    # loc and lastmod can come from recipes.json, so escape them
+    return _TEMPLATE.format(
+        BASE_URL,
+        escape(loc, _XML_ENTITIES),
+        escape(lastmod, _XML_ENTITIES),
+        changefreq,
+        priority,
     )
 
 
-def generate():
-    with open(RECIPES_JSON, 'r') as f:
-        data = json.load(f)
+# Static page entries never change within a run, so build them once at import
+STATIC_ENTRIES_XML = "\n".join(build_url_entry(**page) for page in STATIC_PAGES)
+
+
+def iter_recipes(f):
+    """Yield recipes from an open (binary) recipes.json file"""
+    if ijson is None:
+        yield from json.load(f)["recipes"]
+        return
 
+    found = False
+    for recipe in ijson.items(f, 'recipes.item'):
+        found = True
+        yield recipe
+
+    if not found:
+        # ijson yields nothing both for an empty list and for a file with
+        # no top-level "recipes" array. Re-read with json so the second
+        # case raises KeyError instead of writing a sitemap with no recipes.
+        f.seek(0)
+        if "recipes" not in json.load(f):
+            raise KeyError("recipes")
+
+
+def generate():
     entries = []
 
     # Static pages
     entries.append("  <!-- Main pages -->")
-    for page in STATIC_PAGES:
-        entries.append(build_url_entry(
-            page["loc"], page["lastmod"], page["changefreq"], page["priority"]
-        ))
+    entries.append(STATIC_ENTRIES_XML)
 
     # Recipe pages from JSON
     entries.append("\n  <!-- Recipe pages -->")
-    for recipe in data["recipes"]:
-        slug = recipe["slug"]
-        lastmod = recipe.get("dateModified") or recipe.get("datePublished") or TODAY
-        entries.append(build_url_entry(
-            f"/recipes/{slug}", lastmod, "monthly", "0.8"
-        ))
-
-    sitemap = (
-        '<?xml version="1.0" encoding="UTF-8"?>\n'
-        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-        + "\n".join(entries) + "\n"
-        "</urlset>\n"
-    )
-
+    slugs = []
+    with open(RECIPES_JSON, 'rb') as f:
+        for recipe in iter_recipes(f):
+            slug = recipe["slug"]
+            lastmod = recipe.get("dateModified") or recipe.get("datePublished") or TODAY
+            entries.append(build_url_entry(
+                f"/recipes/{slug}", lastmod, "monthly", "0.8"
+            ))
+            slugs.append(slug)
+    n_recipes = len(slugs)
+
+    # Write entry by entry rather than joining one big string first
     with open(SITEMAP_OUT, 'w') as f:
-        f.write(sitemap)
-
-    print(f"sitemap.xml updated — {len(data['recipes'])} recipe(s) + {len(STATIC_PAGES)} static page(s)")
-    for r in data["recipes"]:
-        print(f"  ✓ /recipes/{r['slug']}")
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        for entry in entries:
+            f.write(entry)
+            f.write("\n")
+        f.write("</urlset>\n")
+
+    print(f"sitemap.xml updated — {n_recipes} recipe(s) + {len(STATIC_PAGES)} static page(s)")
+    for slug in slugs:
+        print(f"  ✓ /recipes/{slug}")
 
 
 if __name__ == "__main__":